@@ -1,16 +1,34 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from functools import lru_cache
 
 # Constants
-NODAL_POINTS = [
+NODAL_POINTS = (
     ("Nodal 1", 29384, 32398),
     ("Nodal 2", 34012, 37303),
     ("Nodal 3", 40257, 43923),
     ("Nodal 4", 51017, 55329),
     ("Nodal 5", 58398, 63152)
-]
+)
+# Column views of NODAL_POINTS for calculations across all nodal points at once
+NODAL_NAMES = tuple(name for name, _, _ in NODAL_POINTS)
+BASE_PAYS = np.array([base_pay for _, base_pay, _ in NODAL_POINTS], dtype=np.float64)
+POST_DDRB_PAYS = np.array([post_ddrb_pay for _, _, post_ddrb_pay in NODAL_POINTS], dtype=np.float64)
+DEFAULT_DOCTOR_COUNTS = (8000, 6000, 20000, 25000, 6000)
+# On-costs as fractions of basic pay: employer pension, 8 additional hours on a 40-hour week, and OOH at 37% of those hours
+PENSION_RATE = 0.237
+ADDITIONAL_HOURS_RATE = 8 / 40
+OOH_RATE = ADDITIONAL_HOURS_RATE * 0.37
+TOTAL_COST_FACTOR = 1 + PENSION_RATE + ADDITIONAL_HOURS_RATE + OOH_RATE
+# Cost breakdown table on-cost columns and their rates on basic pay costs
+ON_COST_COLUMNS = (
+    ("Pension Costs", PENSION_RATE),
+    ("Additional Hours Costs", ADDITIONAL_HOURS_RATE),
+    ("OOH Costs", OOH_RATE),
+)
 AVAILABLE_YEARS = [
     "2008/2009", "2009/2010", "2010/2011", "2011/2012", "2012/2013",
     "2013/2014", "2014/2015", "2015/2016", "2016/2017", "2017/2018",
@@ -18,93 +36,74 @@ AVAILABLE_YEARS = [
     "2023/2024"
 ]
 
+# Historical pay awards and inflation from the provided tables, stored column-wise.
+# 2008/2009 is the baseline year and has no inflation data.
+# Rows line up with AVAILABLE_YEARS, which has one extra final year with no table data.
+PAY_DATA_YEARS = tuple(AVAILABLE_YEARS[:-1])
+PAY_AWARDS = np.array([0.0, 0.015, 0.010, 0.000, 0.000, 0.010, 0.000, 0.000, 0.010, 0.010, 0.020, 0.023, 0.030, 0.030, 0.030])
+RPI_RATES = np.array([0.0, 0.053, 0.052, 0.035, 0.029, 0.025, 0.009, 0.013, 0.035, 0.034, 0.030, 0.015, 0.029, 0.111, 0.114])
+CPI_RATES = np.array([0.0, 0.037, 0.045, 0.030, 0.024, 0.018, 0.000, 0.003, 0.027, 0.024, 0.021, 0.008, 0.015, 0.090, 0.087])
+INFLATION_RATES = {"RPI": RPI_RATES, "CPI": CPI_RATES}
+PAY_DATA_YEAR_INDEX = {year: i for i, year in enumerate(PAY_DATA_YEARS)}
+
 # Calculation Functions
 def calculate_real_terms_change(pay_rise, inflation):
     return ((1 + pay_rise) / (1 + inflation)) - 1
 
-def calculate_new_pay_erosion(current_erosion, real_terms_change):
-    return ((1 + current_erosion) * (1 + real_terms_change)) - 1
+def _compute_fpr_percentage(start_year, end_year, inflation_type):
+    start_index = PAY_DATA_YEAR_INDEX.get(start_year, 0)
+    end_index = PAY_DATA_YEAR_INDEX.get(end_year, len(PAY_DATA_YEARS))
+    pay_awards = PAY_AWARDS[start_index:end_index]
+    inflation_rates = INFLATION_RATES[inflation_type][start_index:end_index]
+
+    # Skip years with no inflation data, and years where pay matched inflation (factor of exactly 1)
+    keep = (inflation_rates != 0.0) & (pay_awards != inflation_rates)
+    cumulative_effect = np.prod((1 + pay_awards[keep]) / (1 + inflation_rates[keep]))
 
-def calculate_fpr_percentage(start_year, end_year, inflation_type):
-    # Data from the provided tables
-    pay_data = [
-        {"year": "2008/2009", "pay_award": 0.0, "rpi": 0.0, "cpi": 0.0},  # Baseline year
-        {"year": "2009/2010", "pay_award": 0.015, "rpi": 0.053, "cpi": 0.037},
-        {"year": "2010/2011", "pay_award": 0.010, "rpi": 0.052, "cpi": 0.045},
-        {"year": "2011/2012", "pay_award": 0.000, "rpi": 0.035, "cpi": 0.030},
-        {"year": "2012/2013", "pay_award": 0.000, "rpi": 0.029, "cpi": 0.024},
-        {"year": "2013/2014", "pay_award": 0.010, "rpi": 0.025, "cpi": 0.018},
-        {"year": "2014/2015", "pay_award": 0.000, "rpi": 0.009, "cpi": 0.000},
-        {"year": "2015/2016", "pay_award": 0.000, "rpi": 0.013, "cpi": 0.003},
-        {"year": "2016/2017", "pay_award": 0.010, "rpi": 0.035, "cpi": 0.027},
-        {"year": "2017/2018", "pay_award": 0.010, "rpi": 0.034, "cpi": 0.024},
-        {"year": "2018/2019", "pay_award": 0.020, "rpi": 0.030, "cpi": 0.021},
-        {"year": "2019/2020", "pay_award": 0.023, "rpi": 0.015, "cpi": 0.008},
-        {"year": "2020/2021", "pay_award": 0.030, "rpi": 0.029, "cpi": 0.015},
-        {"year": "2021/2022", "pay_award": 0.030, "rpi": 0.111, "cpi": 0.090},
-        {"year": "2022/2023", "pay_award": 0.030, "rpi": 0.114, "cpi": 0.087},  # CPI data not provided for this year
-    ]
-    
-    start_index = next((i for i, data in enumerate(pay_data) if data["year"] == start_year), 0)
-    end_index = next((i for i, data in enumerate(pay_data) if data["year"] == end_year), len(pay_data))
-    cumulative_effect = 1.0
-    
-    inflation_key = "rpi" if inflation_type == "RPI" else "cpi"
-    
-    for data in pay_data[start_index:end_index]:
-        inflation_rate = data[inflation_key]
-        if inflation_rate == 0.0:  # Skip years with no inflation data
-            continue
-        real_terms_change = ((1 + data["pay_award"]) / (1 + inflation_rate)) - 1
-        cumulative_effect *= (1 + real_terms_change)
-    
     fpr_percentage = (1 - cumulative_effect) * 100
-    return fpr_percentage
+    return float(fpr_percentage)
+
+# Only a fixed set of (start, end, inflation) combinations exist, so compute them all once at import
+FPR_CACHE = {
+    (start_year, end_year, inflation_type): _compute_fpr_percentage(start_year, end_year, inflation_type)
+    for start_year in AVAILABLE_YEARS
+    for end_year in AVAILABLE_YEARS
+    for inflation_type in INFLATION_RATES
+}
+
+def calculate_fpr_percentage(start_year, end_year, inflation_type):
+    return FPR_CACHE[(start_year, end_year, inflation_type)]
+
+@lru_cache(maxsize=16)
+def get_year_labels(num_years):
+    return tuple(f"Year {i} ({2023+i}/{2024+i})" for i in range(num_years + 1))
 
 def calculate_weighted_average(percentages, doctor_counts):
     total_doctors = sum(doctor_counts.values())
-    weighted_sum = sum(percentages[name] * doctor_counts[name] for name in percentages)
-    return weighted_sum / total_doctors if total_doctors > 0 else 0
-
-def update_nodal_percentages(year):
-    for name, _, _ in NODAL_POINTS:
-        st.session_state[f"nodal_percentages_{year}"][name] = st.session_state[f"percentage_{year}"] / 100
-
-def update_first_year_nodal_percentages():
-    year = 0
-    if any(st.session_state[f"year1_pound_{name}"] > 0 for name, _, _ in NODAL_POINTS):
-        for name, base_pay, _ in NODAL_POINTS:
-            pound_increase = st.session_state[f"year1_pound_{name}"]
-            st.session_state[f"nodal_percentages_{year}"][name] = pound_increase / base_pay
-    else:
-        update_nodal_percentages(year)
+    values = np.fromiter(percentages.values(), dtype=np.float64, count=len(percentages))
+    weights = np.fromiter((doctor_counts[name] for name in percentages), dtype=np.float64, count=len(percentages))
+    return float(values @ weights) / total_doctors if total_doctors > 0 else 0
 
 def initialize_session_state():
-    if 'fpr_start_year' not in st.session_state:
-        st.session_state.fpr_start_year = AVAILABLE_YEARS[0]
-    if 'fpr_end_year' not in st.session_state:
-        st.session_state.fpr_end_year = AVAILABLE_YEARS[-1]
-    if 'inflation_type' not in st.session_state:
-        st.session_state.inflation_type = "RPI"
-    if 'end_year_options' not in st.session_state:
-        st.session_state.end_year_options = AVAILABLE_YEARS[1:]
-    if 'fpr_targets' not in st.session_state:
-        st.session_state.fpr_targets = {}
-    if 'global_inflation' not in st.session_state:
-        st.session_state.global_inflation = 2.0
-    if 'global_pay_rise' not in st.session_state:
-        st.session_state.global_pay_rise = 5.0
-    if 'num_years' not in st.session_state:
-        st.session_state.num_years = 5  # Default to 5 years
+    # These keys are set once per session, so skip the per-key checks on later reruns
+    if not st.session_state.get('_initialized'):
+        st.session_state.setdefault('fpr_start_year', AVAILABLE_YEARS[0])
+        st.session_state.setdefault('fpr_end_year', AVAILABLE_YEARS[-1])
+        st.session_state.setdefault('inflation_type', "RPI")
+        st.session_state.setdefault('end_year_options', AVAILABLE_YEARS[1:])
+        st.session_state.setdefault('fpr_targets', {})
+        st.session_state.setdefault('global_inflation', 2.0)
+        st.session_state.setdefault('global_pay_rise', 5.0)
+        st.session_state.setdefault('num_years', 5)  # Default to 5 years
+        st.session_state._initialized = True
     
     # Calculate initial FPR targets
     update_fpr_targets()
 
 def update_fpr_targets():
-    st.session_state.fpr_targets = {
-        name: calculate_fpr_percentage(st.session_state.fpr_start_year, st.session_state.fpr_end_year, st.session_state.inflation_type)
-        for name, _, _ in NODAL_POINTS
-    }
+    # All nodal points share the same FPR target, so look it up once
+    fpr_percentage = calculate_fpr_percentage(st.session_state.fpr_start_year, st.session_state.fpr_end_year, st.session_state.inflation_type)
+    st.session_state.fpr_targets = dict.fromkeys(NODAL_NAMES, fpr_percentage)
 
 def update_end_year_options():
     start_index = AVAILABLE_YEARS.index(st.session_state.fpr_start_year)
@@ -150,15 +149,13 @@ def setup_sidebar():
     st.sidebar.subheader("Number of Doctors in Each Nodal Point")
     cols = st.sidebar.columns(5)
     doctor_counts = {}
-    default_counts = [8000, 6000, 20000, 25000, 6000]
-    for i, (name, _, _) in enumerate(NODAL_POINTS):
+    for i, name in enumerate(NODAL_NAMES):
         with cols[i]:
-            doctor_counts[name] = st.number_input(f"{name}", min_value=0, value=default_counts[i], step=100, key=f"doctors_{name}")
+            doctor_counts[name] = st.number_input(f"{name}", min_value=0, value=DEFAULT_DOCTOR_COUNTS[i], step=100, key=f"doctors_{name}")
     
     # Store doctor_counts in session state
     st.session_state.doctor_counts = doctor_counts
     
-    # Add global controls
     # Add global controls
     st.sidebar.subheader("Global Settings for Future Years")
     col1, col2 = st.sidebar.columns(2)
@@ -174,22 +171,24 @@ def setup_sidebar():
     # Add subheader for individual year settings
     st.sidebar.subheader("Settings for Individual Years")
     
-    # Setup year inputs
-    year_inputs = setup_year_inputs_sidebar(st.session_state.num_years, inflation_type)
+    # Setup year inputs inside a form so edits are applied in a single rerun on submit
+    with st.sidebar.form("year_inputs_form"):
+        year_inputs = setup_year_inputs_sidebar(st.session_state.num_years, inflation_type)
+        st.form_submit_button("Recalculate")
     
     return inflation_type, fpr_start_year, fpr_end_year, num_years, st.session_state.fpr_targets, st.session_state.doctor_counts, year_inputs
 
 def update_global_settings():
     for year in range(1, st.session_state.num_years + 1):
         st.session_state[f"inflation_{year}"] = st.session_state.global_inflation
-        for name, _, _ in NODAL_POINTS:
+        for name in NODAL_NAMES:
             st.session_state[f"mypd_nodal_percentage_{name}_{year}"] = st.session_state.global_pay_rise
 
 def check_individual_changes():
     for year in range(1, st.session_state.num_years + 1):
         if f"inflation_{year}" in st.session_state and st.session_state[f"inflation_{year}"] != st.session_state.global_inflation:
             return True
-        for name, _, _ in NODAL_POINTS:
+        for name in NODAL_NAMES:
             if f"mypd_nodal_percentage_{name}_{year}" in st.session_state and st.session_state[f"mypd_nodal_percentage_{name}_{year}"] != st.session_state.global_pay_rise:
                 return True
     return False
@@ -199,16 +198,14 @@ def setup_year_inputs_sidebar(num_years, inflation_type):
 
     # Initialize session state for all years
     for year in range(num_years + 1):
-        if f"nodal_percentages_{year}" not in st.session_state:
-            st.session_state[f"nodal_percentages_{year}"] = {name: 0.0 if year == 0 else st.session_state.global_pay_rise for name, _, _ in NODAL_POINTS}
-        if f"pound_increases_{year}" not in st.session_state:
-            st.session_state[f"pound_increases_{year}"] = {name: 0 for name, _, _ in NODAL_POINTS}
-        if f"inflation_{year}" not in st.session_state:
-            st.session_state[f"inflation_{year}"] = 0.033 if year == 0 else st.session_state.global_inflation
+        st.session_state.setdefault(f"nodal_percentages_{year}", dict.fromkeys(NODAL_NAMES, 0.0 if year == 0 else st.session_state.global_pay_rise))
+        st.session_state.setdefault(f"pound_increases_{year}", dict.fromkeys(NODAL_NAMES, 0))
+        st.session_state.setdefault(f"inflation_{year}", 0.033 if year == 0 else st.session_state.global_inflation)
 
+    year_labels = get_year_labels(num_years)
     for year in range(num_years + 1):
         if year == 0:
-            with st.sidebar.expander("Additional Offer for 2023/2024 (not part of MYPD)"):
+            with st.expander("Additional Offer for 2023/2024 (not part of MYPD)"):
                 st.info("This section is for any additional offer for 2023/2024. It is not part of the Multi-Year Pay Deal and is shown separately to avoid confusion.")
                 
                 year_input = {
@@ -219,7 +216,7 @@ def setup_year_inputs_sidebar(num_years, inflation_type):
                 
                 st.write("Consolidated pay offer:")
                 cols = st.columns(5)
-                for i, (name, _, _) in enumerate(NODAL_POINTS):
+                for i, name in enumerate(NODAL_NAMES):
                     with cols[i]:
                         year_input["pound_increases"][name] = st.number_input(
                             f"{name}",
@@ -234,7 +231,7 @@ def setup_year_inputs_sidebar(num_years, inflation_type):
                 
                 st.write("Percentage pay rise:")
                 cols = st.columns(5)
-                for i, (name, _, _) in enumerate(NODAL_POINTS):
+                for i, name in enumerate(NODAL_NAMES):
                     with cols[i]:
                         year_input["nodal_percentages"][name] = st.number_input(
                             f"{name} (%)",
@@ -246,24 +243,23 @@ def setup_year_inputs_sidebar(num_years, inflation_type):
                             key=f"additional_offer_nodal_percentage_{name}"
                         ) / 100
         else:
-            with st.sidebar.expander(f"Year {year} ({2023+year}/{2024+year})"):
+            with st.expander(year_labels[year]):
                 year_input = {
                     "nodal_percentages": {},
                     "pound_increases": {},
                     "inflation": st.slider(
-                        f"Projected Inflation for Year {year} ({2023+year}/{2024+year}) (%)",
+                        f"Projected Inflation for {year_labels[year]} (%)",
                         min_value=0.0,
                         max_value=10.0,
                         value=st.session_state[f"inflation_{year}"],
                         step=0.1,
-                        key=f"inflation_{year}",
-                        on_change=check_individual_changes
+                        key=f"inflation_{year}"
                     ) / 100
                 }
                 
                 st.write("Consolidated pay offer:")
                 cols = st.columns(5)
-                for i, (name, _, _) in enumerate(NODAL_POINTS):
+                for i, name in enumerate(NODAL_NAMES):
                     with cols[i]:
                         year_input["pound_increases"][name] = st.number_input(
                             f"{name}",
@@ -276,7 +272,7 @@ def setup_year_inputs_sidebar(num_years, inflation_type):
                 
                 st.write("Percentage pay rise above inflation:")
                 cols = st.columns(5)
-                for i, (name, _, _) in enumerate(NODAL_POINTS):
+                for i, name in enumerate(NODAL_NAMES):
                     with cols[i]:
                         year_input["nodal_percentages"][name] = st.number_input(
                             f"{name} (%)",
@@ -285,8 +281,7 @@ def setup_year_inputs_sidebar(num_years, inflation_type):
                             value=st.session_state[f"nodal_percentages_{year}"][name],
                             step=0.1,
                             format="%.1f",
-                            key=f"mypd_nodal_percentage_{name}_{year}",
-                            on_change=check_individual_changes
+                            key=f"mypd_nodal_percentage_{name}_{year}"
                         ) / 100
         
         year_inputs.append(year_input)
@@ -297,74 +292,69 @@ def calculate_results(fpr_percentages, doctor_counts, year_inputs, inflation_typ
     results = []
     total_nominal_cost = 0
     total_real_cost = 0
-    cumulative_costs = [0] * (len(year_inputs) + 1)
 
-    for name, base_pay, post_ddrb_pay in NODAL_POINTS:
-        result = calculate_nodal_point_results(name, base_pay, post_ddrb_pay, fpr_percentages[name], doctor_counts[name], year_inputs, inflation_type)
+    # Cached projections are keyed on plain tuples so unrelated reruns skip the numeric work
+    projection = calculate_pay_projection(
+        tuple(fpr_percentages[name] for name in NODAL_NAMES),
+        tuple(doctor_counts[name] for name in NODAL_NAMES),
+        tuple(tuple(year_input["nodal_percentages"][name] for name in NODAL_NAMES) for year_input in year_inputs),
+        tuple(tuple(year_input["pound_increases"][name] for name in NODAL_NAMES) for year_input in year_inputs),
+        tuple(year_input["inflation"] for year_input in year_inputs),
+    )
+
+    for i, (name, base_pay, _) in enumerate(NODAL_POINTS):
+        result = calculate_nodal_point_results(name, base_pay, fpr_percentages[name], doctor_counts[name], year_inputs, projection, i)
         results.append(result)
         total_nominal_cost += result["Total Nominal Cost"]
         total_real_cost += result["Total Real Cost"]
 
-        for j, cost in enumerate(result["Yearly Total Costs"]):
-            cumulative_costs[j] += cost
+    # Total cost of each year across all nodal points
+    cumulative_costs = projection["total_costs"].sum(axis=1)
 
     return results, total_nominal_cost, total_real_cost, cumulative_costs
 
-def calculate_nodal_point_results(name, base_pay, post_ddrb_pay, fpr_percentage, doctor_count, year_inputs, inflation_type):
-    pay_progression_nominal = [base_pay]
-    pay_progression_real = [base_pay]
-    real_terms_pay_cuts = [-fpr_percentage / 100]
-    fpr_progress = [0]
-    net_change_in_pay = [0]
-    yearly_basic_costs = []
-    yearly_total_costs = []
+@st.cache_data(show_spinner=False, max_entries=32)
+def calculate_pay_projection(fpr_percentages, doctor_counts, nodal_percentages, pound_increases, inflation_rates):
+    # Every array below is shaped (years, nodal points) so all nodal points are projected together
+    fpr = np.array(fpr_percentages, dtype=np.float64) / 100
+    counts = np.array(doctor_counts, dtype=np.float64)
+    percentages = np.array(nodal_percentages, dtype=np.float64)
+    pound_increases = np.array(pound_increases, dtype=np.float64)
+    inflation = np.array(inflation_rates, dtype=np.float64)[:, None]
 
-    for year, year_input in enumerate(year_inputs):
-        if year == 0:
-            # Year 0 (2023/2024) calculations - keep existing behavior
-            consolidated_increase = year_input["pound_increases"][name]
-            percentage_increase = year_input["nodal_percentages"][name]
-            total_pay_rise = ((post_ddrb_pay - base_pay) / base_pay) + percentage_increase + (consolidated_increase / base_pay)
-            new_nominal_pay = base_pay * (1 + total_pay_rise)
-            
-            # Calculate only the additional cost beyond the already agreed pay deal
-            additional_pay_increase = new_nominal_pay - post_ddrb_pay
-            basic_pay_cost = additional_pay_increase * doctor_count
-        else:
-            # Subsequent years - implement new approach
-            consolidated_increase = year_input["pound_increases"][name]
-            percentage_increase = year_input["nodal_percentages"][name] + year_input["inflation"]
-            total_pay_rise = percentage_increase + (consolidated_increase / pay_progression_nominal[-1])
-            new_nominal_pay = pay_progression_nominal[-1] * (1 + percentage_increase) + consolidated_increase
-            
-            # Calculate the full cost for subsequent years
-            basic_pay_cost = (new_nominal_pay - pay_progression_nominal[-1]) * doctor_count
+    # Year 0 (2023/2024): the agreed DDRB award plus any additional offer on top of base pay
+    first_year_pay = POST_DDRB_PAYS + BASE_PAYS * percentages[0] + pound_increases[0]
 
-        inflation_rate = year_input["inflation"]
-        new_real_pay = new_nominal_pay / (1 + inflation_rate)
-        
-        real_terms_change = calculate_real_terms_change(total_pay_rise, inflation_rate)
-        current_pay_cut = calculate_new_pay_erosion(real_terms_pay_cuts[-1], real_terms_change)
-        
-        pay_progression_nominal.append(new_nominal_pay)
-        pay_progression_real.append(new_real_pay)
-        real_terms_pay_cuts.append(current_pay_cut)
-        
-        # Calculate FPR progress without capping at 100%
-        current_progress = (fpr_percentage / 100 + current_pay_cut) / (fpr_percentage / 100) * 100
-        fpr_progress.append(current_progress)
-        
-        net_change_in_pay.append(total_pay_rise * 100)
-        
-        # Calculate additional costs
-        pension_cost = basic_pay_cost * 0.237
-        additional_hours_cost = (basic_pay_cost / 40) * 8
-        ooh_component = additional_hours_cost * 0.37
-        
-        total_cost = basic_pay_cost + pension_cost + additional_hours_cost + ooh_component
-        
-        yearly_basic_costs.append(basic_pay_cost)
-        yearly_total_costs.append(total_cost)
+    # Subsequent years: pay = previous pay * (1 + percentage + inflation) + consolidated increase.
+    # Dividing through by the cumulative growth turns the recurrence into a cumulative sum.
+    growth = np.cumprod(1 + percentages[1:] + inflation[1:], axis=0)
+    later_years_pay = growth * (first_year_pay + np.cumsum(pound_increases[1:] / growth, axis=0))
+
+    nominal = np.vstack([first_year_pay, later_years_pay])
+    previous_nominal = np.vstack([BASE_PAYS, nominal[:-1]])
+    total_pay_rise = nominal / previous_nominal - 1
+
+    real_terms_change = calculate_real_terms_change(total_pay_rise, inflation)
+    real_terms_pay_cuts = (1 - fpr) * np.cumprod(1 + real_terms_change, axis=0) - 1
+
+    # Year 0 only costs the additional offer beyond the already agreed pay deal
+    basic_costs = (nominal - np.vstack([POST_DDRB_PAYS, nominal[:-1]])) * counts
+
+    return {
+        "nominal": nominal,
+        "real": nominal / (1 + inflation),
+        "real_terms_pay_cuts": real_terms_pay_cuts,
+        # FPR progress is deliberately not capped at 100%
+        "fpr_progress": (fpr + real_terms_pay_cuts) / fpr * 100,
+        "net_change_in_pay": total_pay_rise * 100,
+        "basic_costs": basic_costs,
+        "total_costs": basic_costs * TOTAL_COST_FACTOR,
+    }
+
+def calculate_nodal_point_results(name, base_pay, fpr_percentage, doctor_count, year_inputs, projection, index):
+    pay_progression_nominal = projection["nominal"][:, index].tolist()
+    pay_progression_real = projection["real"][:, index].tolist()
+    yearly_total_costs = projection["total_costs"][:, index].tolist()
 
     return {
         "Nodal Point": name,
@@ -376,15 +366,15 @@ def calculate_nodal_point_results(name, base_pay, post_ddrb_pay, fpr_percentage,
         "Real Total Increase": pay_progression_real[-1] - base_pay,
         "Nominal Percent Increase": (pay_progression_nominal[-1] / base_pay - 1) * 100,
         "Real Percent Increase": (pay_progression_real[-1] / base_pay - 1) * 100,
-        "Real Terms Pay Cuts": real_terms_pay_cuts[1:],
-        "FPR Progress": fpr_progress[1:],
-        "Net Change in Pay": net_change_in_pay[1:],
+        "Real Terms Pay Cuts": projection["real_terms_pay_cuts"][:, index].tolist(),
+        "FPR Progress": projection["fpr_progress"][:, index].tolist(),
+        "Net Change in Pay": projection["net_change_in_pay"][:, index].tolist(),
         "Doctor Count": doctor_count,
         "Total Nominal Cost": sum(yearly_total_costs),
         "Total Real Cost": sum(yearly_total_costs) / (1 + year_inputs[-1]["inflation"]),
-        "Pay Progression Nominal": pay_progression_nominal[1:],
-        "Pay Progression Real": pay_progression_real[1:],
-        "Yearly Basic Costs": yearly_basic_costs,
+        "Pay Progression Nominal": pay_progression_nominal,
+        "Pay Progression Real": pay_progression_real,
+        "Yearly Basic Costs": projection["basic_costs"][:, index].tolist(),
         "Yearly Total Costs": yearly_total_costs,
     }
 
@@ -397,36 +387,20 @@ def display_cost_breakdown(results, year_inputs):
     cumulative_cost = 0
     for year, tab in enumerate(tabs):
         with tab:
-            cost_data = []
-            year_total = 0
-            
-            for result in results:
-                if year < len(result["Yearly Total Costs"]):
-                    total_cost = result["Yearly Total Costs"][year]
-                    basic_pay_cost = result["Yearly Basic Costs"][year]
-                    pension_cost = basic_pay_cost * 0.237
-                    additional_hours = (basic_pay_cost / 40) * 8
-                    ooh_component = additional_hours * 0.37
-                    
-                    year_total += total_cost
-                    
-                    cost_data.append({
-                        "Nodal Point": result["Nodal Point"],
-                        "Basic Pay Costs": basic_pay_cost,
-                        "Pension Costs": pension_cost,
-                        "Additional Hours Costs": additional_hours,
-                        "OOH Costs": ooh_component,
-                        "Total Costs": total_cost
-                    })
-            
-            df = pd.DataFrame(cost_data)
-            df = df.set_index("Nodal Point")
-            
-            # Format currency values
-            for col in df.columns:
-                df[col] = df[col].apply(lambda x: f"£{x:,.2f}")
+            # Build the table column-wise, deriving the on-costs from each nodal point's basic pay costs
+            basic_pay_costs = np.array([result["Yearly Basic Costs"][year] for result in results])
+            df = pd.DataFrame(
+                {
+                    "Basic Pay Costs": basic_pay_costs,
+                    **{column: basic_pay_costs * rate for column, rate in ON_COST_COLUMNS},
+                    "Total Costs": np.array([result["Yearly Total Costs"][year] for result in results]),
+                },
+                index=pd.Index([result["Nodal Point"] for result in results], name="Nodal Point"),
+            )
+            year_total = float(df["Total Costs"].sum())
             
-            st.dataframe(df.style.set_properties(**{'text-align': 'right'}))
+            # Format currency values at render time, keeping the columns numeric
+            st.dataframe(df.style.format("£{:,.2f}").set_properties(**{'text-align': 'right'}))
             
             cumulative_cost += year_total
             
@@ -445,7 +419,8 @@ def display_results(results, total_nominal_cost, total_real_cost, year_inputs):
     display_cost_breakdown(results, year_inputs)
     
     st.write("All Calculation Summary Table")
-    df_results = pd.DataFrame(results)
+    # Build the table column-wise rather than letting pandas infer columns from each row dict
+    df_results = pd.DataFrame({column: [result[column] for result in results] for column in results[0]})
     
     # Function to round and format numbers for display
     def round_and_format(x):
@@ -483,39 +458,46 @@ def display_visualizations(results, cumulative_costs, year_inputs, inflation_typ
 
     # Create tabs for each nodal point
     nodal_tabs = st.tabs([result["Nodal Point"] for result in results])
+    year_labels = get_year_labels(num_years)
 
     for tab, result in zip(nodal_tabs, results):
         with tab:
-            fig = create_pay_progression_chart(result, num_years)
-            st.plotly_chart(fig, use_container_width=True)
+            # Shared by the chart and the progress table
+            pay_erosion = [-x * 100 for x in result["Real Terms Pay Cuts"]]
+
+            fig = create_pay_progression_chart(result, year_labels, pay_erosion)
+            st.plotly_chart(fig, use_container_width=True, key=f"pay_progression_chart_{result['Nodal Point']}")
 
             st.write(f"FPR progress and Pay Erosion for {result['Nodal Point']}:")
-            progress_df = create_fpr_progress_table(result, num_years, year_inputs)
+            progress_df = create_fpr_progress_table(result, year_labels, year_inputs, pay_erosion)
             st.table(progress_df)
 
-            display_pay_increase_curve(result, year_inputs, cumulative_costs, inflation_type, num_years)
+            display_pay_increase_curve(result, year_inputs, cumulative_costs, inflation_type, year_labels)
             
-def create_pay_progression_chart(result, num_years):
-    years = [f"Year {i} ({2023+i}/{2024+i})" for i in range(num_years + 1)]
-    nominal_pay = result["Pay Progression Nominal"]
+# Figures are only read by st.plotly_chart, so one shared instance per input can be reused
+@st.cache_resource(show_spinner=False, max_entries=16)
+def create_pay_progression_chart(result, years, pay_erosion):
+    nominal_pay = np.asarray(result["Pay Progression Nominal"])
     baseline_pay = result["Base Pay"]
-    pay_increase = [max(0, pay - baseline_pay) for pay in nominal_pay]
-    percent_increase = [(increase / baseline_pay) * 100 for increase in pay_increase]
-    pay_erosion = [-(x) * 100 for x in result["Real Terms Pay Cuts"]]
+    pay_increase = np.maximum(0, nominal_pay - baseline_pay)
+    percent_increase = pay_increase * (100 / baseline_pay)
     fpr_progress = result["FPR Progress"]
 
 
     fig = make_subplots(specs=[[{"secondary_y": True}]])
 
     fig.add_trace(
-        go.Bar(x=years, y=[baseline_pay] * len(years), name="Baseline Pay", marker_color='rgb(0, 123, 255)'),
+        go.Bar(x=years, y=nominal_pay, name="Total Pay", marker_color='rgb(0, 123, 255)',
+               hovertemplate='Year: %{x}<br>Total Pay: £%{y:,.2f}<br>Increase over baseline: £%{customdata[0]:,.2f} (%{customdata[1]:.2f}%)<extra></extra>',
+               customdata=np.column_stack((pay_increase, percent_increase))),
         secondary_y=False,
     )
 
+    # Baseline pay is drawn as a labelled dashed line over the total pay bars
     fig.add_trace(
-        go.Bar(x=years, y=pay_increase, name="Pay Increase", marker_color='rgb(255, 165, 0)',
-               hovertemplate='Year: %{x}<br>Total Pay: £%{customdata[0]:,.2f}<br>Increase: £%{y:,.2f} (%{customdata[1]:.2f}%)<extra></extra>',
-               customdata=list(zip(nominal_pay, percent_increase))),
+        go.Scatter(x=years, y=[baseline_pay] * len(years), mode="lines", name="Baseline Pay",
+                   line=dict(color='rgb(255, 165, 0)', width=2, dash="dash"),
+                   hovertemplate='Baseline Pay: £%{y:,.2f}<extra></extra>'),
         secondary_y=False,
     )
 
@@ -535,8 +517,9 @@ def create_pay_progression_chart(result, num_years):
         yaxis_title="Pay (£)",
         yaxis2_title="Percentage (%)",
         legend=dict(x=0, y=1.1, orientation="h"),
-        barmode='stack',
         height=600,
+        # Keep zoom/legend state across reruns until a different nodal point is shown
+        uirevision=result['Nodal Point'],
     )
 
     fig.update_yaxes(title_text="Pay (£)", secondary_y=False, range=[0, 120000])
@@ -544,9 +527,8 @@ def create_pay_progression_chart(result, num_years):
 
     return fig
 
-def create_fpr_progress_table(selected_data, num_years, year_inputs):
-    years = [f"Year {i} ({2023+i}/{2024+i})" for i in range(num_years + 1)]
-    
+@st.cache_data(show_spinner=False, max_entries=16)
+def create_fpr_progress_table(selected_data, years, year_inputs, pay_erosion):
     pay_rises = []
     for year, year_input in enumerate(year_inputs):
         inflation = year_input["inflation"] * 100
@@ -569,48 +551,50 @@ def create_fpr_progress_table(selected_data, num_years, year_inputs):
         "Year": years,
         "Pay Rise": pay_rises,
         "FPR Progress (%)": selected_data["FPR Progress"],
-        "Pay Erosion (%)": selected_data["Real Terms Pay Cuts"]
+        "Pay Erosion (%)": pay_erosion
     })
 
     df["FPR Progress (%)"] = df["FPR Progress (%)"].apply(lambda x: f"{x:.2f}")
-    df["Pay Erosion (%)"] = df["Pay Erosion (%)"].apply(lambda x: f"{-x * 100:.2f}")
+    df["Pay Erosion (%)"] = df["Pay Erosion (%)"].apply(lambda x: f"{x:.2f}")
 
     return df
 
-def display_pay_increase_curve(selected_data, year_inputs, cumulative_costs, inflation_type, num_years):
-    years = [f"Year {i} ({2023+i}/{2024+i})" for i in range(num_years + 1)]
-    
+def display_pay_increase_curve(selected_data, year_inputs, cumulative_costs, inflation_type, years):
+    fig = create_pay_increase_curve_chart(selected_data, year_inputs, cumulative_costs, years)
+    st.plotly_chart(fig, use_container_width=True, key=f"pay_increase_curve_{selected_data['Nodal Point']}")
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def create_pay_increase_curve_chart(selected_data, year_inputs, cumulative_costs, years):
     nominal_increases = selected_data["Net Change in Pay"]
     real_increases = []
     
-    for year, year_input in enumerate(year_inputs[:num_years + 1]):
+    for year, year_input in enumerate(year_inputs[:len(years)]):
         inflation = year_input["inflation"] * 100
         real_increase = nominal_increases[year] - inflation
         real_increases.append(real_increase)
     
-    cumulative_costs = cumulative_costs[:num_years + 1]
-    actual_cumulative_costs = [sum(cumulative_costs[:i+1]) for i in range(len(cumulative_costs))]
+    actual_cumulative_costs = np.cumsum(np.asarray(cumulative_costs[:len(years)]))
     
     curve_data = pd.DataFrame({
         "Year": years,
         "Nominal Increase": nominal_increases,
         "Real Increase": real_increases,
-        "Cumulative Cost": [cost / 1e6 for cost in actual_cumulative_costs],
+        "Cumulative Cost": actual_cumulative_costs / 1e6,
     })
     
     fig = go.Figure()
 
     fig.add_trace(
         go.Scatter(x=curve_data["Year"], y=curve_data['Nominal Increase'], name="Nominal Increase",
-                   mode='lines+markers', line=dict(shape='spline', smoothing=1.3, color='rgb(0, 123, 255)'))
+                   mode='lines+markers', line=dict(color='rgb(0, 123, 255)'))
     )
     fig.add_trace(
         go.Scatter(x=curve_data["Year"], y=curve_data['Real Increase'], name="Real Increase",
-                   mode='lines+markers', line=dict(shape='spline', smoothing=1.3, color='rgb(135, 206, 250)'))
+                   mode='lines+markers', line=dict(color='rgb(135, 206, 250)'))
     )
     fig.add_trace(
         go.Scatter(x=curve_data["Year"], y=curve_data['Cumulative Cost'], name="Cumulative Cost",
-                   mode='lines+markers', line=dict(shape='spline', smoothing=1.3, color='rgb(255, 99, 71)'), yaxis="y2")
+                   mode='lines+markers', line=dict(color='rgb(255, 99, 71)'), yaxis="y2")
     )
 
     fig.update_layout(
@@ -621,13 +605,15 @@ def display_pay_increase_curve(selected_data, year_inputs, cumulative_costs, inf
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
         hovermode="x unified",
         height=600,
+        uirevision=selected_data['Nodal Point'],
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
     
 def display_fpr_achievement(results):
     st.subheader(":blue-background[👈 Will FPR be achieved from this pay deal? 🕵️]")
-    fpr_achieved = all(result["FPR Progress"][-1] >= 100 for result in results)
+    final_fpr_progress = np.array([result["FPR Progress"][-1] for result in results])
+    fpr_achieved = bool((final_fpr_progress >= 100).all())
     
     if fpr_achieved:
         st.success("Yes, FPR will be achieved for all nodal points.")
@@ -699,6 +685,8 @@ def main():
            - Percentage pay rises
            - Projected inflation rates
 
+           Year-by-year changes are applied together when you press **Recalculate**.
+
         ### Main Display
 
         The main area of the app displays the results of your inputs: